@@ -2,111 +2,204 @@ from fastapi import APIRouter, WebSocket, HTTPException, Depends, Request, Respo
 from ..services.twilio_service import TwilioService
 from ..services.sarvam_service import SarvamAIService
 import base64
-import json
-from typing import Dict, List, Optional
+import orjson
+from typing import Optional, Tuple
 from twilio.twiml.voice_response import VoiceResponse, Connect, Start
 import logging
 import audioop
-import wave
-import io
+import struct
 import os
+import pathlib
 from datetime import datetime
 import asyncio
 import time
+from contextlib import aclosing
+from dataclasses import dataclass, field
 
-# Configure logging
-logging.basicConfig(
-    level=logging.DEBUG,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 twilio_service = TwilioService()
 sarvam_service = SarvamAIService()
 
-# Store active WebSocket connections and their state
-active_connections: Dict[str, WebSocket] = {}
-audio_buffers: Dict[str, List[bytes]] = {}
-processing_locks: Dict[str, bool] = {}
-background_tasks: Dict[str, asyncio.Task] = {}
-speech_states: Dict[str, dict] = {}  # Track speech state for each connection
-
 # Constants for audio processing
 SILENCE_THRESHOLD = 200  # RMS threshold for silence detection
+SPEECH_FLOOR_RMS = 2 * SILENCE_THRESHOLD  # Utterances with a lower overall RMS are treated as noise
 MIN_SPEECH_DURATION_MS = 1000  # Minimum speech duration (1 second)
 MAX_SPEECH_DURATION_MS = 15000  # Maximum speech duration (15 seconds)
 SILENCE_DURATION_MS = 1000  # Duration of silence to mark end of speech
 SAMPLES_PER_MS = 8  # At 8kHz sample rate
+RESPONSE_CHUNK_BYTES = 480  # 60ms of 8kHz mu-law, a multiple of 3 so base64 slices stay aligned
+RESPONSE_CHUNK_B64 = RESPONSE_CHUNK_BYTES * 4 // 3
+RESPONSE_CHUNK_SECONDS = RESPONSE_CHUNK_BYTES / (SAMPLES_PER_MS * 1000)
+RESPONSE_PRIME_CHUNKS = 3  # Chunks sent ahead of real time to fill Twilio's jitter buffer
+DEBUG_AUDIO_DUMP = os.getenv("DEBUG_AUDIO_DUMP") == "1"  # Save call audio under recordings/
+MAX_SPEECH_BYTES = MAX_SPEECH_DURATION_MS * SAMPLES_PER_MS * 2  # 16-bit PCM
 
-def is_silence(audio_data: bytes) -> bool:
-    """Check if audio chunk is silence"""
-    try:
-        pcm_data = audioop.ulaw2lin(audio_data, 2)
-        rms = audioop.rms(pcm_data, 2)
-        return rms < SILENCE_THRESHOLD
-    except:
-        return True
 
-def get_audio_duration_ms(audio_data: List[bytes]) -> float:
+def is_silence(rms: int) -> bool:
+    """Check if a chunk with the given RMS is silence"""
+    return rms < SILENCE_THRESHOLD
+
+def _wav_header(n_bytes: int, rate: int = 8000) -> bytes:
+    """Build the 44-byte RIFF header for mono 16-bit PCM"""
+    return struct.pack(
+        '<4sI4s4sIHHIIHH4sI',
+        b'RIFF', 36 + n_bytes, b'WAVE',
+        b'fmt ', 16, 1, 1, rate, rate * 2, 2, 16,
+        b'data', n_bytes
+    )
+
+WAV_HEADER_BYTES = 44
+
+class PCMBuffer:
+    """Preallocated WAV file holding the current utterance of a connection.
+
+    The RIFF header sits in front of the samples, so the finished utterance
+    can be handed around as a single view without copying it.
+    """
+
+    def __init__(self, size: int = MAX_SPEECH_BYTES):
+        self.data = bytearray(_wav_header(0) + bytes(size))
+        self.view = memoryview(self.data)
+        self.cursor = 0  # PCM bytes written after the header
+
+    def __len__(self) -> int:
+        return self.cursor
+
+    def append(self, pcm_data: bytes) -> int:
+        """Copy decoded 16-bit PCM into the buffer at the cursor, returning the bytes written"""
+        start = WAV_HEADER_BYTES + self.cursor
+        end = min(start + len(pcm_data), len(self.data))
+        self.view[start:end] = pcm_data[:end - start]
+        self.cursor = end - WAV_HEADER_BYTES
+        return end - start
+
+    def getwav(self) -> memoryview:
+        """Patch the RIFF and data chunk sizes and return a view of the WAV file"""
+        struct.pack_into('<I', self.data, 4, 36 + self.cursor)
+        struct.pack_into('<I', self.data, 40, self.cursor)
+        return self.view[:WAV_HEADER_BYTES + self.cursor]
+
+    def clear(self) -> None:
+        self.cursor = 0
+
+@dataclass
+class ConnState:
+    """Everything tracked for one media stream connection"""
+    websocket: WebSocket
+    buffer: PCMBuffer = field(default_factory=PCMBuffer)
+    spare: PCMBuffer = field(default_factory=PCMBuffer)  # Swapped in while the last utterance is processed
+    speech_start: Optional[float] = None  # None until speech is detected
+    last_speech: float = 0.0
+    send_queue: asyncio.Queue = field(default_factory=lambda: asyncio.Queue(maxsize=4))
+    sender: Optional[asyncio.Task] = None
+    processing: Optional[asyncio.Task] = None
+    preconnect: Optional[asyncio.Task] = None  # Opens the Sarvam connection while the caller starts talking
+    sq_sum: int = 0  # Running energy of the buffered utterance
+    sq_count: int = 0
+    truncated: bool = False  # Set once the utterance outgrew the buffer
+
+    @property
+    def connection_id(self) -> str:
+        return str(id(self.websocket))
+
+    @property
+    def busy(self) -> bool:
+        """Whether a turn is still being processed"""
+        return self.processing is not None and not self.processing.done()
+
+    def add_audio(self, pcm_data: bytes, rms: int) -> None:
+        """Buffer a decoded chunk and fold its energy (rms^2 * samples) into the running sum"""
+        written = self.buffer.append(pcm_data)
+        if written < len(pcm_data) and not self.truncated:
+            self.truncated = True
+            logger.warning("Speech buffer full after %dms, dropping further audio until it is processed",
+                           get_audio_duration_ms(self.buffer))
+        n_samples = written // 2
+        self.sq_sum += rms * rms * n_samples
+        self.sq_count += n_samples
+
+    def reset(self) -> None:
+        """Drop the buffered utterance and wait for the next one"""
+        self.buffer.clear()
+        self.speech_start = None
+        self.sq_sum = 0
+        self.sq_count = 0
+        self.truncated = False
+
+    def take_utterance(self) -> PCMBuffer:
+        """Hand off the buffered utterance and start buffering into the spare"""
+        utterance = self.buffer
+        self.buffer, self.spare = self.spare, utterance
+        self.reset()
+        return utterance
+
+def _parse_wav(wav_data: bytes) -> Tuple[int, int, int, memoryview]:
+    """Return (n_channels, sampwidth, framerate, frames) of a PCM WAV file"""
+    riff, _, wave_id = struct.unpack_from('<4sI4s', wav_data, 0)
+    if riff != b'RIFF' or wave_id != b'WAVE':
+        raise ValueError("Not a RIFF/WAVE file")
+
+    fmt = None
+    offset = 12
+    while offset + 8 <= len(wav_data):
+        chunk_id, chunk_size = struct.unpack_from('<4sI', wav_data, offset)
+        offset += 8
+        if chunk_id == b'fmt ':
+            fmt = struct.unpack_from('<HHIIHH', wav_data, offset)
+        elif chunk_id == b'data':
+            if fmt is None:
+                raise ValueError("WAV data chunk precedes fmt chunk")
+            _, n_channels, framerate, _, _, bits_per_sample = fmt
+            sampwidth = bits_per_sample // 8
+            frames = memoryview(wav_data)[offset:offset + chunk_size]
+            # Drop any trailing partial frame, audioop rejects them
+            frames = frames[:len(frames) - len(frames) % (n_channels * sampwidth)]
+            return n_channels, sampwidth, framerate, frames
+        # Chunks are word aligned
+        offset += chunk_size + (chunk_size & 1)
+
+    raise ValueError("WAV file has no data chunk")
+
+def get_audio_duration_ms(audio_data: PCMBuffer) -> float:
     """Calculate duration of audio in milliseconds"""
-    total_bytes = sum(len(chunk) for chunk in audio_data)
-    return (total_bytes / 2) / SAMPLES_PER_MS
+    return (len(audio_data) / 2) / SAMPLES_PER_MS
 
-def convert_audio(audio_data: List[bytes]) -> bytes:
-    """Convert mu-law audio chunks to WAV format"""
+def convert_audio(audio_data: PCMBuffer) -> memoryview:
+    """Finish the buffered WAV file in place and return a view of it"""
     try:
-        # Convert mu-law to linear PCM
-        pcm_data = b''.join([audioop.ulaw2lin(chunk, 2) for chunk in audio_data])
-        
-        # Create WAV file in memory
-        wav_buffer = io.BytesIO()
-        with wave.open(wav_buffer, 'wb') as wav_file:
-            wav_file.setnchannels(1)  # Mono
-            wav_file.setsampwidth(2)  # 2 bytes per sample
-            wav_file.setframerate(8000)  # 8kHz sample rate
-            wav_file.writeframes(pcm_data)
-        
-        return wav_buffer.getvalue()
+        return audio_data.getwav()
     except Exception as e:
-        logger.error(f"Error converting audio: {e}")
+        logger.error("Error converting audio: %s", e)
         raise
 
-def should_process_speech(connection_id: str) -> bool:
+def should_process_speech(conn: ConnState) -> bool:
     """Determine if we should process the current speech buffer"""
-    state = speech_states.get(connection_id, {})
-    if not state:
+    if conn.speech_start is None:
         return False
     
     current_time = time.time() * 1000
-    speech_start = state.get('speech_start', current_time)
-    last_speech = state.get('last_speech', current_time)
     
     # Calculate durations
-    speech_duration = current_time - speech_start
-    silence_duration = current_time - last_speech
+    speech_duration = current_time - conn.speech_start
+    silence_duration = current_time - conn.last_speech
     
     # Process if:
     # 1. We have enough silence after speech
     # 2. OR we've reached maximum duration
     if speech_duration >= MIN_SPEECH_DURATION_MS:
         if silence_duration >= SILENCE_DURATION_MS or speech_duration >= MAX_SPEECH_DURATION_MS:
-            logger.info(f"Processing speech: duration={speech_duration}ms, silence={silence_duration}ms")
+            logger.info("Processing speech: duration=%dms, silence=%dms", speech_duration, silence_duration)
             return True
     
     return False
 
-def convert_to_mulaw(wav_data: bytes) -> bytes:
+async def convert_to_mulaw(wav_data: bytes) -> bytes:
     """Convert WAV audio to mu-law format for Twilio"""
     try:
-        # Read WAV data
-        with wave.open(io.BytesIO(wav_data), 'rb') as wav_file:
-            # Read wav file parameters
-            n_channels = wav_file.getnchannels()
-            sampwidth = wav_file.getsampwidth()
-            framerate = wav_file.getframerate()
-            # Read PCM data
-            pcm_data = wav_file.readframes(wav_file.getnframes())
+        # Read WAV parameters and a view of the PCM data
+        n_channels, sampwidth, framerate, pcm_data = _parse_wav(wav_data)
 
         # Convert to mono if needed
         if n_channels == 2:
@@ -116,26 +209,71 @@ def convert_to_mulaw(wav_data: bytes) -> bytes:
         if sampwidth != 2:
             pcm_data = audioop.lin2lin(pcm_data, sampwidth, 2)
 
-        # Resample to 8kHz if needed
+        # Resample to 8kHz if needed. TTS is requested at 8kHz so this is only a fallback,
+        # run in a worker thread to keep the full-utterance resample off the event loop
         if framerate != 8000:
-            pcm_data = audioop.ratecv(pcm_data, 2, 1, framerate, 8000, None)[0]
+            pcm_data = (await asyncio.to_thread(audioop.ratecv, pcm_data, 2, 1, framerate, 8000, None))[0]
 
         # Convert to mu-law
-        mu_law_data = audioop.lin2ulaw(pcm_data, 2)
-        return mu_law_data
+        return audioop.lin2ulaw(pcm_data, 2)
     except Exception as e:
-        logger.error(f"Error converting to mu-law: {e}")
+        logger.error("Error converting to mu-law: %s", e)
         raise
 
-async def process_audio(websocket: WebSocket, connection_id: str, media_data: dict):
-    """Process audio in background task"""
-    if processing_locks.get(connection_id, False):
+async def warmup():
+    """Run every audio path once at startup so the first call doesn't pay for it"""
+    silence = b"\xff" * 160
+    pcm_data = audioop.ulaw2lin(silence, 2)
+    is_silence(audioop.rms(pcm_data, 2))
+    buffer = PCMBuffer(len(pcm_data))
+    buffer.append(pcm_data)
+    await convert_to_mulaw(bytes(convert_audio(buffer)))
+    await sarvam_service.warmup()
+
+async def dump_audio(filename: str, data: bytes):
+    """Write a debug recording without blocking the event loop"""
+    await asyncio.to_thread(pathlib.Path(filename).write_bytes, data)
+    logger.info("Saved audio file: %s", filename)
+
+async def send_audio_responses(websocket: WebSocket, queue: asyncio.Queue):
+    """Send queued (stream_sid, base64 mu-law payload) responses to Twilio in real-time paced chunks"""
+    loop = asyncio.get_running_loop()
+    while True:
+        stream_sid, payload = await queue.get()
+        try:
+            # Splice aligned base64 slices into a pre-rendered media frame
+            prefix = f'{{"event":"media","streamSid":{orjson.dumps(stream_sid).decode()},"media":{{"payload":"'
+            suffix = '"}}'
+            
+            # Send audio response in chunks paced against a fixed schedule, so the time
+            # spent sending doesn't accumulate as drift. Starting the schedule in the
+            # past lets the first chunks go out immediately.
+            deadline = loop.time() - RESPONSE_PRIME_CHUNKS * RESPONSE_CHUNK_SECONDS
+            for i in range(0, len(payload), RESPONSE_CHUNK_B64):
+                await websocket.send_text(prefix + payload[i:i + RESPONSE_CHUNK_B64] + suffix)
+                
+                deadline += RESPONSE_CHUNK_SECONDS
+                delay = deadline - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                
+            logger.info("Audio response sent successfully in chunks")
+        except Exception as e:
+            logger.error("Error sending response audio: %s", e)
+        finally:
+            queue.task_done()
+
+def start_processing(conn: ConnState, media_data: dict):
+    """Process the buffered speech in a background task unless one is already running"""
+    if conn.busy:
         logger.debug("Already processing audio for this connection")
         return
-        
+    conn.processing = asyncio.create_task(process_audio(conn, media_data))
+
+async def process_audio(conn: ConnState, media_data: dict):
+    """Process audio in background task"""
     try:
-        processing_locks[connection_id] = True
-        buffer = audio_buffers[connection_id]
+        buffer = conn.buffer
         
         if not buffer:
             return
@@ -143,23 +281,24 @@ async def process_audio(websocket: WebSocket, connection_id: str, media_data: di
         duration_ms = get_audio_duration_ms(buffer)
         if duration_ms < MIN_SPEECH_DURATION_MS:
             return
+        
+        # Skip the STT -> OpenAI -> TTS chain for buffers that hold no real speech
+        if conn.sq_count and conn.sq_sum < SPEECH_FLOOR_RMS * SPEECH_FLOOR_RMS * conn.sq_count:
+            logger.debug("Dropping %dms of near-silent audio", duration_ms)
+            conn.reset()
+            return
             
-        logger.info(f"Processing audio buffer of duration {duration_ms}ms")
+        logger.info("Processing audio buffer of duration %dms", duration_ms)
         
         try:
-            # Convert to WAV
-            wav_data = convert_audio(buffer)
+            # Swap buffers so audio received from here on starts the next turn. The spare is
+            # only reused after this task finishes, so the WAV view stays valid until then.
+            wav_data = convert_audio(conn.take_utterance())
             
             # Save audio file for debugging
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"recordings/audio_{timestamp}_{int(duration_ms)}ms_{connection_id}.wav"
-            with open(filename, "wb") as f:
-                f.write(wav_data)
-            logger.info(f"Saved audio file: {filename}")
-            
-            # Clear buffer and reset speech state
-            audio_buffers[connection_id] = []
-            speech_states[connection_id] = {}
+            if DEBUG_AUDIO_DUMP:
+                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+                await dump_audio(f"recordings/audio_{timestamp}_{int(duration_ms)}ms_{conn.connection_id}.wav", wav_data)
             
             # Process audio through Sarvam AI
             logger.info("Starting speech-to-text translation")
@@ -168,116 +307,78 @@ async def process_audio(websocket: WebSocket, connection_id: str, media_data: di
             )
             
             if english_text and len(english_text.strip()) > 0:
-                logger.info(f"Speech translated to English: '{english_text}', Original language: {original_language}")
+                logger.info("Speech translated to English: '%s', Original language: %s", english_text, original_language)
                 
-                # Get response from OpenAI
+                # Stream the response from OpenAI and speak it sentence by sentence,
+                # so playback starts before the whole reply has been generated. aclosing
+                # closes the OpenAI stream right away if the turn is cancelled on disconnect
                 logger.info("Getting response from OpenAI")
-                english_response = await sarvam_service.get_openai_response(english_text)
-                logger.info(f"OpenAI response: '{english_response}'")
-                
-                # Translate response if needed
-                if original_language != "en-IN" or original_language is not None:
-                    logger.info(f"Translating response to {original_language}")
-                    translated_response = await sarvam_service.translate_text(
-                        input_text=english_response,
-                        target_language=original_language,
-                        source_language="en-IN"
-                    )
-                    logger.info(f"Translated response: '{translated_response}'")
-                else:
-                    translated_response = english_response
-                
-                # Convert to speech
-                logger.info("Converting response to speech")
-                response_audio = await sarvam_service.text_to_speech(
-                    text=translated_response,
-                    target_language=original_language
-                )
-                
-                if response_audio and websocket in active_connections.values():
-                    try:
-                        # Decode base64 audio
-                        wav_bytes = base64.b64decode(response_audio)
-                        
-                        # Save response WAV for debugging
-                        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                        response_filename = f"recordings/response_{timestamp}_{int(duration_ms)}ms_{connection_id}.wav"
-                        with open(response_filename, "wb") as f:
-                            f.write(wav_bytes)
-                        logger.info(f"Saved response WAV file: {response_filename}")
+                sentence_index = 0
+                async with aclosing(sarvam_service.stream_openai_response(english_text)) as sentences:
+                    async for sentence in sentences:
+                        logger.info("OpenAI response sentence: '%s'", sentence)
                         
-                        # Convert to mu-law format for Twilio
-                        mu_law_audio = convert_to_mulaw(wav_bytes)
+                        # Convert to speech, text_to_speech translates non-English targets itself
+                        logger.info("Converting response to speech in %s", original_language)
+                        response_audio = await sarvam_service.text_to_speech(
+                            text=sentence,
+                            target_language=original_language or "en-IN"
+                        )
                         
-                        # Save mu-law audio for debugging
-                        mulaw_filename = f"recordings/response_{timestamp}_{int(duration_ms)}ms_{connection_id}.ulaw"
-                        with open(mulaw_filename, "wb") as f:
-                            f.write(mu_law_audio)
-                        logger.info(f"Saved mu-law audio file: {mulaw_filename}")
-                        
-                        # Encode mu-law audio to base64 for Twilio
-                        response_payload = base64.b64encode(mu_law_audio).decode('utf-8')
-                        
-                        # Send audio response in chunks to avoid buffer overflow
-                        chunk_size = 640  # 20ms chunks at 8kHz
-                        for i in range(0, len(mu_law_audio), chunk_size):
-                            chunk = mu_law_audio[i:i + chunk_size]
-                            chunk_payload = base64.b64encode(chunk).decode('utf-8')
-                            
-                            # Send chunk to Twilio
-                            await websocket.send_text(json.dumps({
-                                "event": "media",
-                                "streamSid": media_data["streamSid"],
-                                "media": {
-                                    "payload": chunk_payload
-                                }
-                            }))
-                            
-                            # Small delay between chunks
-                            await asyncio.sleep(0.02)  # 20ms delay between chunks
-                            
-                        logger.info("Audio response sent successfully in chunks")
-                        
-                    except Exception as e:
-                        logger.error(f"Error handling response audio: {e}")
-                else:
-                    logger.error("No response audio generated or websocket disconnected")
+                        if response_audio:
+                            try:
+                                # Decode base64 audio
+                                wav_bytes = base64.b64decode(response_audio)
+                                
+                                # Save response WAV for debugging
+                                if DEBUG_AUDIO_DUMP:
+                                    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+                                    await dump_audio(f"recordings/response_{timestamp}_{int(duration_ms)}ms_{sentence_index}_{conn.connection_id}.wav", wav_bytes)
+                                
+                                # Convert to mu-law format for Twilio
+                                mu_law_audio = await convert_to_mulaw(wav_bytes)
+                                
+                                # Encode once, then hand off to the connection's sender task so
+                                # media keeps being received
+                                payload = base64.b64encode(mu_law_audio).decode('ascii')
+                                await conn.send_queue.put((media_data["streamSid"], payload))
+                                logger.info("Audio response queued for sending")
+                                
+                            except Exception as e:
+                                logger.error("Error handling response audio: %s", e)
+                        else:
+                            logger.error("No response audio generated")
+                        sentence_index += 1
             else:
                 logger.info("No speech detected in audio")
         
         except Exception as e:
-            logger.error(f"Error processing audio chunk: {str(e)}")
-            # Don't clear buffer on error unless it's too long
-            if duration_ms >= MAX_SPEECH_DURATION_MS:
-                audio_buffers[connection_id] = []
-                speech_states[connection_id] = {}
+            logger.error("Error processing audio chunk: %s", e)
     
     except Exception as e:
-        logger.error(f"Error in process_audio: {e}")
-    
-    finally:
-        processing_locks[connection_id] = False
+        logger.error("Error in process_audio: %s", e)
 
 @router.websocket("/ws/media-stream")
 async def handle_media_stream(websocket: WebSocket):
     """Handle WebSocket connection for media streaming"""
     connection_id = str(id(websocket))
-    logger.info(f"New WebSocket connection: {connection_id}")
+    logger.info("New WebSocket connection: %s", connection_id)
     
     await websocket.accept()
-    logger.info(f"WebSocket connection accepted: {connection_id}")
+    logger.info("WebSocket connection accepted: %s", connection_id)
+    # No socket tuning needed: asyncio and uvloop transports already set TCP_NODELAY on
+    # accepted sockets, and send_audio_responses paces output at real time so the kernel's
+    # autotuned send buffer never holds more than a few chunks
     
     try:
         # Initialize connection state
-        active_connections[connection_id] = websocket
-        audio_buffers[connection_id] = []
-        processing_locks[connection_id] = False
-        speech_states[connection_id] = {}
+        conn = websocket.state.conn = ConnState(websocket)
+        conn.sender = asyncio.create_task(send_audio_responses(websocket, conn.send_queue))
         
         while True:
             # Receive audio data from Twilio
             data = await websocket.receive_text()
-            media_data = json.loads(data)
+            media_data = orjson.loads(data)
             
             if media_data.get("event") == "media":
                 # Process audio chunk
@@ -285,67 +386,59 @@ async def handle_media_stream(websocket: WebSocket):
                 current_time = time.time() * 1000
                 
                 # Update speech state based on silence detection
-                is_silent = is_silence(audio_data)
-                state = speech_states.get(connection_id, {})
+                # Decode once, the PCM feeds both silence detection and the buffer
+                pcm_data = audioop.ulaw2lin(audio_data, 2)
+                rms = audioop.rms(pcm_data, 2)
+                is_silent = is_silence(rms)
                 
                 if not is_silent:
                     # Speech detected
-                    if not state:
+                    if conn.speech_start is None:
                         # Start of new speech
-                        state = {
-                            'speech_start': current_time,
-                            'last_speech': current_time
-                        }
-                    else:
-                        # Continue speech
-                        state['last_speech'] = current_time
-                    speech_states[connection_id] = state
+                        conn.speech_start = current_time
+                    conn.last_speech = current_time
                     
                     # Add audio to buffer
-                    audio_buffers[connection_id].append(audio_data)
+                    conn.add_audio(pcm_data, rms)
                     
-                    # Check if we should process (max duration reached)
-                    if should_process_speech(connection_id):
-                        await process_audio(websocket, connection_id, media_data)
+                    # Check if we should process (max duration reached), unless a turn is still running
+                    if not conn.busy and should_process_speech(conn):
+                        start_processing(conn, media_data)
                 else:
                     # Silence detected
-                    if state:
+                    if conn.speech_start is not None:
                         # Add silence to buffer
-                        audio_buffers[connection_id].append(audio_data)
+                        conn.add_audio(pcm_data, rms)
                         
-                        # Check if we should process (enough silence after speech)
-                        if should_process_speech(connection_id):
-                            await process_audio(websocket, connection_id, media_data)
+                        # Check if we should process (enough silence after speech), unless a turn is still running
+                        if not conn.busy and should_process_speech(conn):
+                            start_processing(conn, media_data)
                 
             elif media_data.get("event") == "start":
                 logger.info("Media stream started")
+                # The startup pre-connect has usually expired by the time a call arrives,
+                # so reopen it now, the first utterance takes at least 2s to flush
+                conn.preconnect = asyncio.create_task(sarvam_service.warmup())
             elif media_data.get("event") == "stop":
                 logger.info("Media stream stopped")
                 # Process any remaining audio
-                if audio_buffers[connection_id]:
-                    await process_audio(websocket, connection_id, media_data)
+                if conn.buffer:
+                    start_processing(conn, media_data)
             elif media_data.get("event") == "mark":
-                logger.info(f"Received mark event: {media_data.get('type')}")
+                logger.info("Received mark event: %s", media_data.get('type'))
     
     except Exception as e:
-        logger.error(f"WebSocket error: {e}")
+        logger.error("WebSocket error: %s", e)
     
     finally:
         # Clean up connection
-        if connection_id in active_connections:
-            del active_connections[connection_id]
-        if connection_id in audio_buffers:
-            del audio_buffers[connection_id]
-        if connection_id in processing_locks:
-            del processing_locks[connection_id]
-        if connection_id in speech_states:
-            del speech_states[connection_id]
-        if connection_id in background_tasks:
-            task = background_tasks[connection_id]
-            if not task.done():
-                task.cancel()
-            del background_tasks[connection_id]
-        logger.info(f"WebSocket connection closed and cleaned up: {connection_id}")
+        # Connection state is dropped along with the websocket, only in-flight tasks need stopping
+        conn = getattr(websocket.state, "conn", None)
+        if conn:
+            for task in (conn.processing, conn.sender, conn.preconnect):
+                if task and not task.done():
+                    task.cancel()
+        logger.info("WebSocket connection closed and cleaned up: %s", connection_id)
         try:
             await websocket.close()
         except:
@@ -361,7 +454,7 @@ async def handle_incoming_call(request: Request):
         # Get call information
         from_number = form_data.get('From', 'Unknown')
         from_city = form_data.get('FromCity', 'Unknown City')
-        logger.info(f"Call from {from_number} in {from_city}")
+        logger.info("Call from %s in %s", from_number, from_city)
         
         # Create TwiML response
         response = VoiceResponse()
@@ -385,27 +478,27 @@ async def handle_incoming_call(request: Request):
         response.pause(length=3600)  # Keep the call alive for up to an hour
         
         logger.info("Generated TwiML response")
-        logger.debug(f"TwiML: {str(response)}")
+        logger.debug("TwiML: %s", response)
         
         # Return TwiML response
         return Response(content=str(response), media_type="application/xml")
     
     except Exception as e:
-        logger.error(f"Error handling incoming call: {e}")
+        logger.error("Error handling incoming call: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/outbound-call")
 async def create_outbound_call(call_data: dict):
     """Create an outbound call"""
     try:
-        logger.info(f"Creating outbound call: {call_data}")
+        logger.info("Creating outbound call: %s", call_data)
         call = twilio_service.create_call(
             to_number=call_data["to"],
             webhook_url=call_data["webhook_url"],
             from_number=call_data.get("from")  # Optional from_number
         )
-        logger.info(f"Outbound call created successfully: {call.sid}")
+        logger.info("Outbound call created successfully: %s", call.sid)
         return {"call_sid": call.sid}
     except Exception as e:
-        logger.error(f"Error creating outbound call: {e}")
+        logger.error("Error creating outbound call: %s", e)
         raise HTTPException(status_code=500, detail=str(e)) 
\ No newline at end of file
@@ -1,13 +1,20 @@
 from dotenv import load_dotenv
+import logging
 import os
 
 # Load environment variables first, before any other imports
 load_dotenv()
 
+# Configure logging once for the whole app
+logging.basicConfig(
+    level=os.getenv("LOG_LEVEL", "INFO").upper(),
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+
 from fastapi import FastAPI, WebSocket
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
-from app.api.call_handler import router as call_router
+from app.api.call_handler import router as call_router, sarvam_service, warmup
 
 app = FastAPI(title="99phones API", description="Voice Call Processing API with Sarvam AI Integration")
 
@@ -23,6 +30,14 @@ app.add_middleware(
 # Include the call_handler router
 app.include_router(call_router, prefix="", tags=["calls"])
 
+@app.on_event("startup")
+async def startup():
+    await warmup()
+
+@app.on_event("shutdown")
+async def shutdown():
+    await sarvam_service.aclose()
+
 # Health check endpoint
 @app.get("/health")
 async def health_check():
@@ -31,4 +46,12 @@ async def health_check():
 if __name__ == "__main__":
     port = int(os.getenv("PORT", 8000))
     host = os.getenv("HOST", "0.0.0.0")
-    uvicorn.run("app.main:app", host=host, port=port, reload=True) 
\ No newline at end of file
+    # uvloop is not available on Windows, fall back to the default asyncio loop there
+    try:
+        import uvloop  # noqa: F401
+        loop = "uvloop"
+    except ImportError:
+        loop = "asyncio"
+    # Auto-reload is for development only
+    reload = os.getenv("RELOAD") == "1"
+    uvicorn.run("app.main:app", host=host, port=port, reload=reload, loop=loop)
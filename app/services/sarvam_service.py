@@ -2,41 +2,71 @@ import os
 import base64
 import json
 import logging
+import re
 import httpx
-import tempfile
-from openai import OpenAI
-from typing import Tuple, Optional
+from openai import AsyncOpenAI
+from typing import AsyncIterator, Tuple, Optional, Union
 
-# Configure logging
-logging.basicConfig(
-    level=logging.DEBUG,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger(__name__)
 
+# System prompt shared by every OpenAI request
+SYSTEM_MESSAGE = """You are a helpful assistant in a phone conversation. 
+Keep your responses concise and natural, as they will be spoken back to the user.
+Aim to keep responses under 2-3 sentences unless more detail is specifically requested."""
+
+FALLBACK_RESPONSE = "I apologize, but I'm having trouble processing your request at the moment. Could you please try again?"
+
+# A sentence ends at ., ? or ! followed by whitespace
+SENTENCE_END = re.compile(r'(?<=[.?!])\s+')
+
+# A split after a title, common abbreviation or initial is not a real sentence end
+ABBREVIATION = re.compile(r'\b(?:Mr|Mrs|Ms|Dr|Prof|Sr|Jr|St|vs|e\.g|i\.e|[A-Z])\.$')
+
+# Shorter fragments are spoken together with the next sentence, each flush
+# costs a translate and a TTS round trip
+MIN_SENTENCE_CHARS = 20
+
 class SarvamAIService:
     def __init__(self):
         self.api_key = os.getenv("SARVAM_API_KEY")
         self.base_url = "https://api.sarvam.ai"
-        self.openai_client = OpenAI()
+        self.openai_client = AsyncOpenAI()
         
         if not self.api_key:
             raise ValueError("SARVAM_API_KEY environment variable not set")
+
+        # Shared client so every request reuses a pooled HTTP/2 connection. Idle
+        # connections are kept well past httpx's 5s default, since the gap between
+        # one turn's TTS and the next turn's STT is playback plus speech plus silence
+        self._client = httpx.AsyncClient(
+            base_url=self.base_url,
+            http2=True,
+            headers={'api-subscription-key': self.api_key},
+            timeout=httpx.Timeout(30.0, connect=5.0),
+            limits=httpx.Limits(max_keepalive_connections=8, max_connections=16, keepalive_expiry=120.0)
+        )
+
+    async def warmup(self):
+        """Open a pooled connection to Sarvam AI ahead of the next request, it stays idle for up to keepalive_expiry"""
+        try:
+            await self._client.head("/", timeout=5.0)
+        except httpx.HTTPError as e:
+            logger.warning("Could not pre-connect to Sarvam AI: %s", e)
+
+    async def aclose(self):
+        """Close the pooled HTTP connections"""
+        await self._client.aclose()
     
-    async def transcribe_and_translate_audio(self, audio_data: bytes, prompt: str = None) -> Tuple[Optional[str], Optional[str]]:
+    async def transcribe_and_translate_audio(self, audio_data: Union[bytes, memoryview], prompt: str = None) -> Tuple[Optional[str], Optional[str]]:
         """
         Transcribe audio and translate to English if needed.
         Returns (transcript, language_code)
         """
         try:
-            # Create temporary file to store audio data
-            with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as temp_file:
-                temp_file.write(audio_data)
-                temp_file_path = temp_file.name
-
-            # Prepare files and data
+            # Prepare files and data, the WAV is uploaded straight from memory.
+            # httpx only streams bytes or file objects, so a view is copied once here.
             files = {
-                'file': ('audio.wav', open(temp_file_path, 'rb'), 'audio/wav')
+                'file': ('audio.wav', bytes(audio_data), 'audio/wav')
             }
             
             data = {
@@ -46,40 +76,31 @@ class SarvamAIService:
             if prompt:
                 data['prompt'] = prompt
             
-            headers = {
-                'api-subscription-key': self.api_key
-            }
-            
             # Make API request
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.base_url}/speech-to-text-translate",
-                    files=files,
-                    data=data,
-                    headers=headers,
-                    timeout=30.0
-                )
-                
-                # Clean up temp file
-                os.unlink(temp_file_path)
+            response = await self._client.post(
+                "/speech-to-text-translate",
+                files=files,
+                data=data,
+                timeout=30.0
+            )
+            
+            if response.status_code == 200:
+                result = response.json()
+                transcript = result.get("transcript", "")
+                language_code = result.get("language_code", "en-IN")
                 
-                if response.status_code == 200:
-                    result = response.json()
-                    transcript = result.get("transcript", "")
-                    language_code = result.get("language_code", "en-IN")
-                    
-                    # Return empty if no speech detected
-                    if not transcript:
-                        logger.info("No speech detected in audio")
-                        return None, None
-                        
-                    return transcript.strip(), language_code
-                else:
-                    logger.error(f"Sarvam AI API error: {response.status_code} - {response.text}")
+                # Return empty if no speech detected
+                if not transcript:
+                    logger.info("No speech detected in audio")
                     return None, None
                     
+                return transcript.strip(), language_code
+            else:
+                logger.error("Sarvam AI API error: %s - %s", response.status_code, response.text)
+                return None, None
+                    
         except Exception as e:
-            logger.error(f"Error in transcribe_and_translate_audio: {str(e)}")
+            logger.error("Error in transcribe_and_translate_audio: %s", e)
             return None, None
     
     async def translate_text(
@@ -102,38 +123,32 @@ class SarvamAIService:
                 "enable_preprocessing": True
             }
             
-            headers = {
-                "Content-Type": "application/json",
-                "api-subscription-key": self.api_key
-            }
+            response = await self._client.post(
+                "/translate",
+                json=payload,
+                timeout=10.0
+            )
             
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.base_url}/translate",
-                    json=payload,
-                    headers=headers,
-                    timeout=10.0
-                )
-                
-                if response.status_code == 200:
-                    result = response.json()
-                    translated_text = result.get("translated_text")
-                    if translated_text:
-                        return translated_text.strip()
-                    return input_text
-                else:
-                    logger.error(f"Translation error: {response.status_code} - {response.text}")
-                    return input_text
+            if response.status_code == 200:
+                result = response.json()
+                translated_text = result.get("translated_text")
+                if translated_text:
+                    return translated_text.strip()
+                return input_text
+            else:
+                logger.error("Translation error: %s - %s", response.status_code, response.text)
+                return input_text
                     
         except Exception as e:
-            logger.error(f"Error in translate_text: {str(e)}")
+            logger.error("Error in translate_text: %s", e)
             return input_text
     
     async def text_to_speech(
         self,
         text: str,
         target_language: str = "en-IN",
-        speaker: str = "meera"
+        speaker: str = "meera",
+        sample_rate: int = 8000
     ) -> Optional[str]:
         """Convert text to speech using Sarvam AI"""
         try:
@@ -150,76 +165,85 @@ class SarvamAIService:
                 if translated_text:
                     text = translated_text[:500]
             
-            logger.info(f"Sending TTS request for text: '{text}' in language: {target_language}")
+            logger.info("Sending TTS request for text: '%s' in language: %s", text, target_language)
             
             payload = {
                 "inputs": [text],
                 "target_language_code": target_language,
                 "speaker": speaker,
+                "speech_sample_rate": sample_rate,
                 "model": "bulbul:v1"
             }
             
-            headers = {
-                "Content-Type": "application/json",
-                "api-subscription-key": self.api_key
-            }
+            response = await self._client.post(
+                "/text-to-speech",
+                json=payload,
+                timeout=10.0
+            )
             
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.base_url}/text-to-speech",
-                    json=payload,
-                    headers=headers,
-                    timeout=10.0
-                )
-                
-                if response.status_code == 200:
-                    result = response.json()
-                    if result.get("audios"):
-                        # Get base64 audio and verify it's valid
-                        audio_base64 = result["audios"][0]
-                        try:
-                            # Verify base64 can be decoded
-                            audio_bytes = base64.b64decode(audio_base64)
-                            logger.info(f"Successfully generated audio of size: {len(audio_bytes)} bytes")
-                            return audio_base64
-                        except Exception as e:
-                            logger.error(f"Invalid base64 audio data: {e}")
-                            return None
-                    logger.error("No audio in response")
-                    return None
-                else:
-                    logger.error(f"TTS error: {response.status_code} - {response.text}")
-                    return None
+            if response.status_code == 200:
+                result = response.json()
+                if result.get("audios"):
+                    # Get base64 audio and verify it's valid
+                    audio_base64 = result["audios"][0]
+                    try:
+                        # Verify base64 can be decoded
+                        audio_bytes = base64.b64decode(audio_base64)
+                        logger.info("Successfully generated audio of size: %d bytes", len(audio_bytes))
+                        return audio_base64
+                    except Exception as e:
+                        logger.error("Invalid base64 audio data: %s", e)
+                        return None
+                logger.error("No audio in response")
+                return None
+            else:
+                logger.error("TTS error: %s - %s", response.status_code, response.text)
+                return None
                     
         except Exception as e:
-            logger.error(f"Error in text_to_speech: {str(e)}")
+            logger.error("Error in text_to_speech: %s", e)
             return None
     
-    async def get_openai_response(self, user_message: str) -> str:
-        """Get response from OpenAI"""
+    async def stream_openai_response(self, user_message: str) -> AsyncIterator[str]:
+        """Stream a response from OpenAI, yielding it one sentence at a time"""
+        buffer = ""
+        pending = ""  # Complete fragments held back until they make a real sentence
+        yielded = False
         try:
-            # Create system message for context
-            system_message = """You are a helpful assistant in a phone conversation. 
-            Keep your responses concise and natural, as they will be spoken back to the user.
-            Aim to keep responses under 2-3 sentences unless more detail is specifically requested."""
-            
-            # Get completion from OpenAI
-            completion = self.openai_client.chat.completions.create(
+            stream = await self.openai_client.chat.completions.create(
                 model="gpt-3.5-turbo",
                 messages=[
-                    {"role": "system", "content": system_message},
+                    {"role": "system", "content": SYSTEM_MESSAGE},
                     {"role": "user", "content": user_message}
                 ],
                 max_tokens=150,
-                temperature=0.7
+                temperature=0.7,
+                stream=True
             )
             
-            # Extract and return the response
-            response = completion.choices[0].message.content.strip()
-
-            print("response from openai for the query is ", response)
-            return response
+            # Closing the stream releases the HTTP response, also when the caller
+            # closes this generator early
+            async with stream:
+                async for chunk in stream:
+                    if not chunk.choices:
+                        continue
+                    buffer += chunk.choices[0].delta.content or ""
+                    
+                    # Yield every complete sentence, keep the unfinished tail
+                    *sentences, buffer = SENTENCE_END.split(buffer)
+                    for sentence in sentences:
+                        pending = f"{pending} {sentence}".strip()
+                        if len(pending) >= MIN_SENTENCE_CHARS and not ABBREVIATION.search(pending):
+                            yielded = True
+                            yield pending
+                            pending = ""
+            
+            tail = f"{pending} {buffer}".strip()
+            if tail:
+                yielded = True
+                yield tail
             
         except Exception as e:
-            logger.error(f"Error getting OpenAI response: {str(e)}")
-            return "I apologize, but I'm having trouble processing your request at the moment. Could you please try again?"
\ No newline at end of file
+            logger.error("Error getting OpenAI response: %s", e)
+            if not yielded:
+                yield FALLBACK_RESPONSE
\ No newline at end of file